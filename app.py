@@ -1,12 +1,72 @@
 import streamlit as st
 import requests
 import json
+import gzip
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
 # Configuration
 API_KEY_FILE = "api_key.txt"
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 MODEL = "stepfun/step-3.5-flash:free"
+# stepfun/step-3.5-flash accepts a 256k token context; leave room for the prompt and the summary
+MODEL_MAX_INPUT_TOKENS = 200_000
+# (input token limit, model) pairs ordered by limit. The first model whose limit fits
+# the input is used; longer inputs are split into chunks that fit the last model.
+# Add cheaper or longer-context tiers here to route requests by input size.
+MODEL_ROUTES = [
+    (MODEL_MAX_INPUT_TOKENS, MODEL)
+]
+BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "HTTP-Referer": "http://localhost:8501",
+    "X-Title": "Text Summarizer"
+}
+# The system prompt is kept constant so providers can cache it as a shared prefix;
+# everything that varies per request goes into the user message.
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that creates concise and accurate summaries of text. "
+    "Provide clear, well-structured summaries that capture the main points "
+    "and keep to the requested length."
+)
+USER_PROMPT_TEMPLATE = "Please summarize the following text in approximately {word_limit} words:\n\n{text}"
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 10
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 30.0  # seconds
+GZIP_MIN_BYTES = 4096
+GZIP_UNRELATED_STATUS_CODES = {401, 402, 403, 429}  # failures that compression cannot cause
+STREAM_UPDATE_INTERVAL = 0.05  # seconds between partial summary redraws
+CHARS_PER_TOKEN = 3  # conservative estimate, non-English text uses more tokens per character
+MAX_CHUNKS = 8  # inputs that would need more chunks are truncated
+CHUNK_FILL = 0.9  # target chunk size as a fraction of the model limit, leaving room to cut at a boundary
+CHUNK_SUMMARY_WORDS = 250
+MAX_CHUNK_WORKERS = 2  # free models allow about 20 requests per minute
+CHUNK_ATTEMPTS = 2
+SUMMARY_CACHE_TTL = 3600  # seconds
+SUMMARY_CACHE_MAX_ENTRIES = 512
+DISK_CACHE_DIR = ".summary_cache"  # set to None to keep summaries in memory only
+DISK_CACHE_TTL = 30 * 86400  # seconds
+DISK_CACHE_MAX_BYTES = 500 * 1024 * 1024
+DISK_CACHE_PRUNE_TARGET = 0.9  # fraction of DISK_CACHE_MAX_BYTES kept after pruning
+DISK_CACHE_TOUCH_INTERVAL = 3600  # seconds between last-access updates of an entry
+
+@st.cache_resource(max_entries=1)
+def read_api_key_file(path, mtime):
+    """Read the API key file once per modification time (mtime is part of the cache key)."""
+    with open(path, 'r') as f:
+        api_key = f.read().strip()
+        return api_key if api_key else None
 
 def load_api_key():
     """Load the OpenRouter API key from api_key.txt file."""
@@ -14,53 +74,529 @@ def load_api_key():
         key_path = Path(API_KEY_FILE)
         if not key_path.exists():
             return None
-        with open(key_path, 'r') as f:
-            api_key = f.read().strip()
-            return api_key if api_key else None
+        return read_api_key_file(str(key_path), key_path.stat().st_mtime)
     except Exception as e:
         st.error(f"Error reading API key file: {str(e)}")
         return None
 
-def summarize_text(text, api_key, word_limit=100):
+@st.cache_resource
+def get_http_session():
+    """Create a shared HTTP session so TLS connections to OpenRouter are reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=0
+    )
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_transport_state():
+    """
+    Track whether the API accepts gzip-compressed request bodies, shared by all sessions.
+    
+    "gzip" is None until a compressed request has succeeded (True) or been
+    shown to fail only because of compression (False).
+    """
+    return {"gzip": None}
+
+@st.cache_resource
+def get_summary_cache():
+    """Create the in-memory summary cache shared by all sessions of this process."""
+    return {"entries": OrderedDict(), "lock": threading.Lock()}
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different inputs share a cache entry."""
+    return " ".join(text.split())
+
+def summary_settings_fingerprint():
+    """Hash the settings that shape a summary, so cached summaries are not reused after they change."""
+    settings = repr((
+        SYSTEM_PROMPT,
+        USER_PROMPT_TEMPLATE,
+        CHUNK_SUMMARY_WORDS,
+        CHUNK_FILL,
+        CHARS_PER_TOKEN,
+        MODEL_ROUTES
+    ))
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+def make_cache_key(model, word_limit, text):
+    """Build a deterministic cache key for a summary request."""
+    normalized = normalize_text(text)
+    key = f"{summary_settings_fingerprint()}|{model}|{word_limit}|{normalized}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def get_cached_summary(cache_key):
+    """Return a cached summary for the key, or None if it is missing or expired."""
+    cache = get_summary_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(cache_key)
+        if entry is None:
+            return None
+        stored_at, summary = entry
+        if time.monotonic() - stored_at > SUMMARY_CACHE_TTL:
+            del cache["entries"][cache_key]
+            return None
+        cache["entries"].move_to_end(cache_key)
+        return summary
+
+def store_summary(cache_key, summary):
+    """Store a successful summary, evicting the least recently used entries."""
+    cache = get_summary_cache()
+    with cache["lock"]:
+        cache["entries"][cache_key] = (time.monotonic(), summary)
+        cache["entries"].move_to_end(cache_key)
+        while len(cache["entries"]) > SUMMARY_CACHE_MAX_ENTRIES:
+            cache["entries"].popitem(last=False)
+
+def retry_delay(attempt, response=None):
+    """Compute the backoff delay before the next attempt, honoring Retry-After."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt * (1 + random.random() * 0.5))
+
+def encode_payload(payload):
+    """Serialize a request payload to compact UTF-8 JSON."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def post_with_retries(headers, body, stream=False):
+    """POST an encoded body to OpenRouter, retrying timeouts and transient HTTP errors with exponential backoff."""
+    session = get_http_session()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = session.post(
+                OPENROUTER_API_URL,
+                headers=headers,
+                data=body,
+                timeout=60,
+                stream=stream
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(retry_delay(attempt))
+            continue
+        
+        if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+            delay = retry_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+            continue
+        
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
+
+def post_request_body(headers, body, stream=False):
+    """
+    POST an encoded body, gzip-compressing large bodies while the API accepts them.
+    
+    Until a compressed request has succeeded, any HTTP error other than
+    GZIP_UNRELATED_STATUS_CODES makes the request be repeated uncompressed;
+    if that succeeds, compression is turned off for the rest of the process.
+    """
+    transport_state = get_transport_state()
+    if transport_state["gzip"] is not False and len(body) > GZIP_MIN_BYTES:
+        compressed_headers = {**headers, "Content-Encoding": "gzip"}
+        try:
+            response = post_with_retries(compressed_headers, gzip.compress(body, compresslevel=6), stream)
+            transport_state["gzip"] = True
+            return response
+        except requests.exceptions.HTTPError as e:
+            if (
+                transport_state["gzip"]
+                or e.response is None
+                or e.response.status_code in GZIP_UNRELATED_STATUS_CODES
+            ):
+                raise
+            e.response.close()
+        
+        response = post_with_retries(headers, body, stream)
+        transport_state["gzip"] = False
+        return response
+    
+    return post_with_retries(headers, body, stream)
+
+def read_streamed_summary(response, on_update=None):
+    """
+    Collect the summary from a server-sent events completion stream.
+    
+    Args:
+        response (requests.Response): Streaming response from OpenRouter
+        on_update (callable): Optional callback receiving the partial summary,
+            throttled to one call per STREAM_UPDATE_INTERVAL
+        
+    Returns:
+        str: The full summary text
+        
+    Raises:
+        requests.exceptions.ConnectionError: If the stream ends before the
+            completion finishes, so a partial summary is never returned as a result
+    """
+    parts = []
+    last_update = 0.0
+    finished = False
+    for line in response.iter_lines():
+        # Skip keep-alive comments such as ": OPENROUTER PROCESSING"
+        if not line.startswith(b"data:"):
+            continue
+        data = line[len(b"data:"):].strip()
+        if data == b"[DONE]":
+            finished = True
+            break
+        
+        chunk = json.loads(data)
+        if 'error' in chunk:
+            error = chunk['error']
+            if isinstance(error, dict):
+                error = error.get('message', 'unknown error')
+            raise RuntimeError(str(error))
+        if not chunk.get('choices'):
+            continue
+        
+        if chunk['choices'][0].get('finish_reason'):
+            finished = True
+        content = chunk['choices'][0].get('delta', {}).get('content')
+        if content:
+            parts.append(content)
+            now = time.monotonic()
+            if on_update is not None and now - last_update >= STREAM_UPDATE_INTERVAL:
+                on_update("".join(parts))
+                last_update = now
+    
+    if not finished:
+        raise requests.exceptions.ConnectionError("Response stream ended before the summary was complete")
+    return "".join(parts)
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in text without loading a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text down to roughly max_tokens tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars]
+
+def split_into_chunks(text, n_chunks, max_chars):
+    """
+    Split text into n_chunks chunks of similar size, preferring paragraph and word boundaries.
+    
+    Args:
+        text (str): The text to split
+        n_chunks (int): Number of chunks to produce
+        max_chars (int): Hard upper bound on the length of any chunk
+        
+    Returns:
+        list: The non-empty chunks
+    """
+    target = len(text) / n_chunks
+    # Moving a cut back lengthens the next chunk by the same amount, so never move
+    # it further than max_chars allows (and never more than half a chunk)
+    max_shift = max(0, min(target / 2, max_chars - target))
+    chunks = []
+    start = 0
+    for i in range(1, n_chunks):
+        end = int(target * i)
+        earliest = max(start + 1, int(end - max_shift))
+        cut = text.rfind("\n\n", earliest, end)
+        if cut < 0:
+            cut = text.rfind(" ", earliest, end)
+        if cut < 0:
+            cut = end
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+def pick_route(n_tokens):
+    """Pick the first (input token limit, model) route that fits n_tokens, falling back to the last one."""
+    for max_tokens, model in MODEL_ROUTES:
+        if n_tokens <= max_tokens:
+            return max_tokens, model
+    return MODEL_ROUTES[-1]
+
+def request_summary(text, headers, model, word_limit, on_update=None):
+    """
+    Request a single summary from OpenRouter.
+    
+    Args:
+        text (str): The text to summarize
+        headers (dict): Request headers including the Authorization header
+        model (str): OpenRouter model to use
+        word_limit (int): Approximate number of words for the summary
+        on_update (callable): Optional callback receiving the partial summary while it streams
+        
+    Returns:
+        str: The summary text (empty if the API returned no content)
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": USER_PROMPT_TEMPLATE.format(word_limit=word_limit, text=text)}
+        ],
+        "stream": True
+    }
+    
+    with post_request_body(headers, encode_payload(payload), stream=True) as response:
+        return read_streamed_summary(response, on_update)
+
+def is_transient_error(error):
+    """Return True for request failures that may succeed if the request is repeated later."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return (
+        isinstance(error, requests.exceptions.HTTPError)
+        and error.response is not None
+        and error.response.status_code in RETRY_STATUS_CODES
+    )
+
+def summarize_chunk(chunk, headers, model):
+    """
+    Summarize one map-reduce chunk, trying again after a pause on transient failures.
+    
+    Non-transient errors (for example an invalid API key) are raised right away.
+    
+    Returns:
+        tuple: (summary, None) on success, (None, error) if the chunk still failed
+            transiently after CHUNK_ATTEMPTS tries, or (None, None) if the API
+            returned no content
+    """
+    error = None
+    for attempt in range(CHUNK_ATTEMPTS):
+        if attempt:
+            # Wait out the per-minute rate limit window before trying again
+            time.sleep(RETRY_MAX_DELAY)
+        try:
+            summary = request_summary(chunk, headers, model, CHUNK_SUMMARY_WORDS)
+        except requests.exceptions.RequestException as e:
+            if not is_transient_error(e):
+                raise
+            error = e
+            continue
+        return (summary, None) if summary else (None, None)
+    return None, error
+
+@st.cache_resource
+def get_inflight_requests():
+    """Create the registry of summaries currently being generated, shared by all sessions."""
+    return {"events": {}, "lock": threading.Lock()}
+
+def join_inflight_request(cache_key):
+    """
+    Register a summary request so identical concurrent requests share one API call.
+    
+    Args:
+        cache_key (str): Cache key of the requested summary
+        
+    Returns:
+        tuple: The threading.Event set when the request finishes, and True if
+            the caller should make the request or False if it should wait for it
+    """
+    inflight = get_inflight_requests()
+    with inflight["lock"]:
+        event = inflight["events"].get(cache_key)
+        if event is not None:
+            return event, False
+        event = threading.Event()
+        inflight["events"][cache_key] = event
+        return event, True
+
+def finish_inflight_request(cache_key, event):
+    """Unregister a finished summary request and wake up callers waiting on it."""
+    inflight = get_inflight_requests()
+    with inflight["lock"]:
+        inflight["events"].pop(cache_key, None)
+    event.set()
+
+@st.cache_resource
+def get_disk_cache_path():
+    """Create the on-disk summary cache database and return its path."""
+    # Resolve next to app.py so the location doesn't depend on the working directory
+    cache_dir = Path(__file__).parent / DISK_CACHE_DIR
+    cache_dir.mkdir(exist_ok=True)
+    db_path = str(cache_dir / "summaries.sqlite3")
+    with closing(sqlite3.connect(db_path, timeout=5)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS summaries_stored_at ON summaries (stored_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed_at ON summaries (accessed_at)")
+    return db_path
+
+def load_persisted_summary(cache_key):
+    """Return a summary from the disk cache, or None if it is missing, expired or unreadable."""
+    if DISK_CACHE_DIR is None:
+        return None
+    try:
+        with closing(sqlite3.connect(get_disk_cache_path(), timeout=5)) as conn, conn:
+            row = conn.execute(
+                "SELECT summary, stored_at, accessed_at FROM summaries WHERE key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            summary, stored_at, accessed_at = row
+            now = time.time()
+            if now - stored_at > DISK_CACHE_TTL:
+                conn.execute("DELETE FROM summaries WHERE key = ?", (cache_key,))
+                return None
+            # Only record the access now and then so most hits stay read-only
+            if now - accessed_at > DISK_CACHE_TOUCH_INTERVAL:
+                conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, cache_key))
+            return summary
+    except (OSError, sqlite3.Error):
+        return None
+
+def disk_cache_used_bytes(conn):
+    """Return the number of bytes used by live pages of the disk cache database."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - freelist_count) * page_size
+
+def prune_disk_cache(conn, now):
+    """Remove expired entries, then least recently used ones, until the cache is back under its size target."""
+    conn.execute("DELETE FROM summaries WHERE stored_at < ?", (now - DISK_CACHE_TTL,))
+    used_bytes = disk_cache_used_bytes(conn)
+    target_bytes = DISK_CACHE_MAX_BYTES * DISK_CACHE_PRUNE_TARGET
+    if used_bytes <= target_bytes:
+        return
+    row_count = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+    keep = int(row_count * target_bytes / used_bytes)
+    conn.execute(
+        "DELETE FROM summaries WHERE key IN ("
+        "SELECT key FROM summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+        (keep,)
+    )
+
+def persist_summary(cache_key, summary):
+    """Write a summary to the disk cache, pruning it once it grows past DISK_CACHE_MAX_BYTES."""
+    if DISK_CACHE_DIR is None:
+        return
+    now = time.time()
+    try:
+        with closing(sqlite3.connect(get_disk_cache_path(), timeout=5)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (cache_key, summary, now, now)
+            )
+            if disk_cache_used_bytes(conn) > DISK_CACHE_MAX_BYTES:
+                prune_disk_cache(conn, now)
+    except (OSError, sqlite3.Error):
+        pass
+
+def summarize_text(text, api_key, word_limit=100, on_update=None, on_notice=None):
     """
     Summarize the provided text using OpenRouter API with stepfun/step-3.5-flash:free model.
     
+    The model is chosen from MODEL_ROUTES by input size. Text longer than
+    the chosen model's input limit is split into at most MAX_CHUNKS chunks
+    that are summarized concurrently before the chunk summaries are
+    summarized together; text that would need more chunks is truncated, and
+    chunks that keep failing are left out.
+    Concurrent calls with the same input wait for a single API request.
+    
     Args:
         text (str): The text to summarize
         api_key (str): OpenRouter API key
         word_limit (int): Maximum number of words for the summary (default: 100)
+        on_update (callable): Optional callback receiving the partial summary while it streams
+        on_notice (callable): Optional callback receiving a message when the input is
+            truncated or parts of it could not be summarized
         
     Returns:
         str: Summarized text or error message
     """
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost:8501",
-        "X-Title": "Text Summarizer"
-    }
+    max_tokens = int(MODEL_ROUTES[-1][0] * CHUNK_FILL) * MAX_CHUNKS
+    if estimate_tokens(text) > max_tokens:
+        text = truncate_to_tokens(text, max_tokens)
+        if on_notice is not None:
+            on_notice(
+                f"⚠️ The text is longer than about {max_tokens * CHARS_PER_TOKEN:,} characters, "
+                "so only the beginning was summarized."
+            )
     
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {
-                "role": "system",
-                "content": f"You are a helpful assistant that creates concise and accurate summaries of text. Provide clear, well-structured summaries that capture the main points. Keep your summary to approximately {word_limit} words."
-            },
-            {
-                "role": "user",
-                "content": f"Please summarize the following text in approximately {word_limit} words:\n\n{text}"
-            }
-        ]
-    }
+    route_max_tokens, model = pick_route(estimate_tokens(text))
+    cache_key = make_cache_key(model, word_limit, text)
+    cached_summary = get_cached_summary(cache_key)
+    if cached_summary is not None:
+        return cached_summary
+    
+    persisted_summary = load_persisted_summary(cache_key)
+    if persisted_summary is not None:
+        store_summary(cache_key, persisted_summary)
+        return persisted_summary
+    
+    # Wait for any identical request in progress; if it fails, exactly one of
+    # the waiters takes over while the rest keep waiting
+    while True:
+        inflight_event, is_leader = join_inflight_request(cache_key)
+        if is_leader:
+            break
+        inflight_event.wait()
+        cached_summary = get_cached_summary(cache_key)
+        if cached_summary is not None:
+            return cached_summary
     
     try:
-        response = requests.post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        result = response.json()
+        # A previous leader may have finished between our cache miss and registering
+        cached_summary = get_cached_summary(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+        
+        # Built once here and shared by every chunk and reduce request
+        headers = {**BASE_HEADERS, "Authorization": f"Bearer {api_key}"}
+        n_tokens = estimate_tokens(text)
+        skipped_chunks = 0
+        if n_tokens > route_max_tokens:
+            # Spread the text evenly over the fewest chunks that fit the model
+            chunk_tokens = int(route_max_tokens * CHUNK_FILL)
+            chunks = split_into_chunks(
+                text,
+                -(-n_tokens // chunk_tokens),
+                route_max_tokens * CHARS_PER_TOKEN
+            )
+            executor = ThreadPoolExecutor(max_workers=min(MAX_CHUNK_WORKERS, len(chunks)))
+            try:
+                futures = [executor.submit(summarize_chunk, chunk, headers, model) for chunk in chunks]
+                chunk_results = [future.result() for future in futures]
+            finally:
+                # A non-transient error fails every chunk the same way, so drop queued ones
+                executor.shutdown(wait=True, cancel_futures=True)
+            
+            chunk_summaries = [summary for summary, _ in chunk_results if summary]
+            skipped_chunks = len(chunks) - len(chunk_summaries)
+            if not chunk_summaries:
+                errors = [error for _, error in chunk_results if error is not None]
+                if errors:
+                    raise errors[-1]
+                return "Error: Unexpected response format from API"
+            if skipped_chunks and on_notice is not None:
+                on_notice(
+                    f"⚠️ {skipped_chunks} of {len(chunks)} parts of the text could not be summarized "
+                    "and were left out of the summary."
+                )
+            text = "\n\n".join(chunk_summaries)
+        
+        summary = request_summary(text, headers, model, word_limit, on_update)
         
-        if 'choices' in result and len(result['choices']) > 0:
-            summary = result['choices'][0]['message']['content']
+        if summary:
+            # Summaries with missing parts are returned but not cached, so a retry can do better
+            if not skipped_chunks:
+                store_summary(cache_key, summary)
+                persist_summary(cache_key, summary)
             return summary
         else:
             return "Error: Unexpected response format from API"
@@ -69,8 +605,12 @@ def summarize_text(text, api_key, word_limit=100):
         return f"Error making API request: {str(e)}"
     except json.JSONDecodeError:
         return "Error: Could not parse API response"
+    except RuntimeError as e:
+        return f"Error returned by API: {str(e)}"
     except Exception as e:
         return f"Unexpected error: {str(e)}"
+    finally:
+        finish_inflight_request(cache_key, inflight_event)
 
 def main():
     """Main application function."""
@@ -126,22 +666,24 @@ def main():
     
     with col1:
         st.subheader("Input Text")
-        user_text = st.text_area(
-            "Enter the text you want to summarize:",
-            height=350,
-            placeholder="Paste or type your text here..."
-        )
-        
-        word_limit = st.slider(
-            "Summary length (words):",
-            min_value=30,
-            max_value=150,
-            value=100,
-            step=10,
-            help="Adjust the approximate length of the summary"
-        )
-        
-        summarize_button = st.button("✨ Summarize", type="primary", use_container_width=True)
+        # The form batches widget changes so typing and slider drags don't rerun the app
+        with st.form("summarize_form"):
+            user_text = st.text_area(
+                "Enter the text you want to summarize:",
+                height=350,
+                placeholder="Paste or type your text here..."
+            )
+            
+            word_limit = st.slider(
+                "Summary length (words):",
+                min_value=30,
+                max_value=150,
+                value=100,
+                step=10,
+                help="Adjust the approximate length of the summary"
+            )
+            
+            summarize_button = st.form_submit_button("✨ Summarize", type="primary", use_container_width=True)
     
     with col2:
         st.subheader("Summary")
@@ -151,9 +693,15 @@ def main():
             if not user_text or not user_text.strip():
                 summary_placeholder.warning("⚠️ Please enter some text to summarize.")
             else:
-                with st.spinner("Generating summary..."):
-                    summary = summarize_text(user_text, api_key, word_limit)
-                    summary_placeholder.markdown(summary)
+                summary_placeholder.info("⏳ Generating summary...")
+                summary = summarize_text(
+                    user_text,
+                    api_key,
+                    word_limit,
+                    on_update=summary_placeholder.markdown,
+                    on_notice=st.warning
+                )
+                summary_placeholder.markdown(summary)
         else:
             summary_placeholder.info("👈 Enter text and click 'Summarize' to see the result here.")
     